@@ -2,9 +2,8 @@ import os
 import json
 import re
 import openai
-from dotenv import load_dotenv
-
-load_dotenv()
+from agents.pools import get_openai_client
+from agents.coalescer import coalescer
 
 def _extract_text_from_response(resp):
     try:
@@ -24,7 +23,7 @@ def _extract_text_from_response(resp):
 def _call_openai_chat(messages, model="gpt-4o", max_tokens=800, temperature=0.3):
     try:
         if hasattr(openai, "OpenAI"):
-            client = openai.OpenAI()
+            client = get_openai_client()
             if hasattr(client, "chat") and hasattr(client.chat, "completions") and hasattr(client.chat.completions, "create"):
                 resp = client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens, temperature=temperature)
                 return _extract_text_from_response(resp)
@@ -120,18 +119,31 @@ def generate_blog_post(
         return _fallback_blog_post(industry, keywords, core_analysis_summary, competitors, customer_profile, word_count, references)
 
 
-def generate_table_data(core_analysis_summary):
-    prompt = f"""
+TABLE_INSTRUCTIONS = """
     Based on the following executive summary, generate ONLY a Markdown table for a 'Profit & Loss Impact Analysis'.
     Columns must be: Impact Area | Description | Recommended Action
     Return only the Markdown table (no explanation).
+    """
+
+GRAPH_INSTRUCTIONS = """
+    Based on the following summary, generate ONLY a JSON object for a small bar graph with keys:
+    {
+    "title": "<short title>",
+    "data": { "<label>": <numeric_value>, ... }
+    }
+    Do NOT include explanation or Markdown. Values must be numeric (integers or floats).
+    """
 
+def generate_table_data(core_analysis_summary):
+    prompt = f"""{TABLE_INSTRUCTIONS}
     --- SUMMARY ---
     {core_analysis_summary}
     """
     messages = [{"role":"user","content":prompt}]
     try:
-        text = _call_openai_chat(messages, model="gpt-4o-mini", max_tokens=400, temperature=0.1)
+        text = coalescer.call("table", TABLE_INSTRUCTIONS, core_analysis_summary, model="gpt-4o-mini", max_tokens=400, temperature=0.1)
+        if text is None:
+            text = _call_openai_chat(messages, model="gpt-4o-mini", max_tokens=400, temperature=0.1)
         if text:
             if "|" in text and ("---" in text or "\n| " in text or "\n---" in text):
                 start = text.find("|")
@@ -175,19 +187,15 @@ def generate_table_data(core_analysis_summary):
 
 
 def generate_graph_data(core_analysis_summary):
-    prompt = f"""
-    Based on the following summary, generate ONLY a JSON object for a small bar graph with keys:
-    {{
-    "title": "<short title>",
-    "data": {{ "<label>": <numeric_value>, ... }}
-    }}
-    Do NOT include explanation or Markdown. Values must be numeric (integers or floats).
+    prompt = f"""{GRAPH_INSTRUCTIONS}
     --- SUMMARY ---
     {core_analysis_summary}
     """
     messages = [{"role":"user","content":prompt}]
     try:
-        text = _call_openai_chat(messages, model="gpt-4o-mini", max_tokens=300, temperature=0.1)
+        text = coalescer.call("graph", GRAPH_INSTRUCTIONS, core_analysis_summary, model="gpt-4o-mini", max_tokens=300, temperature=0.1)
+        if text is None:
+            text = _call_openai_chat(messages, model="gpt-4o-mini", max_tokens=300, temperature=0.1)
         if text:
             import re, json
             m = re.search(r'(\{[\s\S]*\})', text)
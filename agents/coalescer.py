@@ -0,0 +1,101 @@
+import json
+import threading
+from concurrent.futures import Future
+
+from agents.pools import get_openai_client
+
+COALESCE_WINDOW = 0.05
+MAX_BATCH = 4
+
+
+class RequestCoalescer:
+    def __init__(self, window=COALESCE_WINDOW, max_batch=MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self.lock = threading.Lock()
+        self.batches = {}
+        self.combined_calls = 0
+        self.coalesced_requests = 0
+
+    def call(self, task, instructions, context, model="gpt-4o-mini", max_tokens=400, temperature=0.1):
+        # Returns the task's output from a combined call, or None when the caller
+        # should fall back to its own individual request (no partner arrived or the
+        # combined call failed).
+        key = (model, temperature, context)
+        future = Future()
+        flush_now = None
+        with self.lock:
+            batch = self.batches.get(key)
+            if batch is None or task in batch["tasks"]:
+                batch = {"key": key, "tasks": {}, "max_tokens": 0}
+                batch["timer"] = threading.Timer(self.window, self._flush, args=(batch,))
+                batch["timer"].daemon = True
+                self.batches[key] = batch
+                batch["timer"].start()
+            batch["tasks"][task] = (instructions, future)
+            batch["max_tokens"] += max_tokens
+            if len(batch["tasks"]) >= self.max_batch:
+                batch["timer"].cancel()
+                flush_now = batch
+        if flush_now:
+            self._flush(flush_now)
+        return future.result()
+
+    def _flush(self, batch):
+        with self.lock:
+            if self.batches.get(batch["key"]) is batch:
+                del self.batches[batch["key"]]
+            elif batch.get("flushed"):
+                return
+            batch["flushed"] = True
+        tasks = batch["tasks"]
+        if len(tasks) == 1:
+            for _, future in tasks.values():
+                future.set_result(None)
+            return
+        model, temperature, context = batch["key"]
+        try:
+            outputs = self._combined_call(tasks, context, model, batch["max_tokens"], temperature)
+            with self.lock:
+                self.combined_calls += 1
+                self.coalesced_requests += len(tasks)
+            print(f"[INFO] Coalesced {len(tasks)} {model} requests ({', '.join(tasks)}) into one call.")
+        except Exception as e:
+            print(f"[WARN] Coalesced call failed, falling back to individual requests: {e}")
+            outputs = {}
+        for name, (_, future) in tasks.items():
+            value = outputs.get(name)
+            if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+                # JSON mode renders "a comma-separated list" as an array; give the task the text it asked for.
+                value = ", ".join(str(v).strip() for v in value)
+            elif value is not None and not isinstance(value, str):
+                value = json.dumps(value)
+            future.set_result(value or None)
+
+    def _combined_call(self, tasks, context, model, max_tokens, temperature):
+        task_list = "\n\n".join(f'### Task "{name}"\n{instructions}' for name, (instructions, _) in tasks.items())
+        prompt = (
+            f"Complete each of the following {len(tasks)} independent tasks using the shared CONTEXT below.\n"
+            f"Return a single JSON object with exactly these keys: {', '.join(json.dumps(n) for n in tasks)}. "
+            "Each value must be that task's complete output, formatted exactly as the task asks (as a string, "
+            "or as a JSON object if the task asks for JSON). Do not add any other keys or commentary.\n\n"
+            f"{task_list}\n\n--- CONTEXT ---\n{context}"
+        )
+        response = get_openai_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            response_format={"type": "json_object"},
+        )
+        outputs = json.loads(response.choices[0].message.content)
+        if not isinstance(outputs, dict):
+            raise ValueError("Combined response is not a JSON object")
+        return outputs
+
+    def stats(self):
+        with self.lock:
+            return {"combined_calls": self.combined_calls, "coalesced_requests": self.coalesced_requests}
+
+
+coalescer = RequestCoalescer()
@@ -0,0 +1,145 @@
+import re
+import zlib
+import random
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.8
+TITLE_SHINGLE_SIZE = 2
+TITLE_SIMILARITY_THRESHOLD = 0.7
+# Shorter titles ("No title", "Untitled") are too generic to identify a paper on their own.
+MIN_TITLE_TOKENS = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed so signatures are comparable across runs and processes.
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1)) for _ in range(NUM_PERMUTATIONS)]
+
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "ref", "ref_src", "oc", "hl", "gl", "ceid"}
+
+
+def canonicalize_url(url):
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    if host == "arxiv.org":
+        # abs/2401.01234v2 and pdf/2401.01234v1.pdf are the same paper.
+        path = re.sub(r"^/(abs|pdf)/(.+?)(v\d+)?(\.pdf)?$", r"/abs/\2", path)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def _normalize_text(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    tokens = _normalize_text(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(shingle_set):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    if not hashes:
+        return None
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+def _article_text(article):
+    title = article.get("title") or ""
+    content = article.get("content") or ""
+    # Google News items repeat the title as content; don't double-weight it.
+    return title if content == title else f"{title} {content}"
+
+
+class _LSHIndex:
+    # LSH banding keeps lookups linear overall: a signature is only compared
+    # with the few earlier signatures that share at least one band bucket.
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = []
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]) for band in range(BANDS)]
+
+    def matches(self, signature):
+        if signature is None:
+            return False
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self.buckets.get(key, ()))
+        return any(estimated_similarity(signature, self.signatures[i]) >= self.threshold for i in candidates)
+
+    def add(self, signature):
+        if signature is None:
+            return
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(index)
+
+
+def _title_signature(article):
+    # The same paper from arXiv (full abstract) and a scholar scraper (short
+    # snippet) shares little body text, so titles are matched on their own.
+    tokens = _normalize_text(article.get("title"))
+    if len(tokens) < MIN_TITLE_TOKENS:
+        return None, None
+    return " ".join(tokens), minhash_signature(shingles(" ".join(tokens), TITLE_SHINGLE_SIZE))
+
+
+def dedupe_articles(articles, threshold=SIMILARITY_THRESHOLD):
+    seen_urls = set()
+    seen_titles = set()
+    text_index = _LSHIndex(threshold)
+    title_index = _LSHIndex(TITLE_SIMILARITY_THRESHOLD)
+    unique = []
+    dropped = 0
+    for article in articles:
+        url_key = canonicalize_url(article.get("link"))
+        title_key, title_signature = _title_signature(article)
+        text_signature = minhash_signature(shingles(_article_text(article)))
+        if ((url_key and url_key in seen_urls)
+                or (title_key and title_key in seen_titles)
+                or title_index.matches(title_signature)
+                or text_index.matches(text_signature)):
+            dropped += 1
+            continue
+
+        unique.append(article)
+        if url_key:
+            seen_urls.add(url_key)
+        if title_key:
+            seen_titles.add(title_key)
+        title_index.add(title_signature)
+        text_index.add(text_signature)
+
+    if dropped:
+        print(f"[INFO] Dropped {dropped} duplicate article(s), kept {len(unique)}.")
+    return unique
@@ -0,0 +1,189 @@
+import os
+import gc
+import sys
+import time
+import threading
+
+import psutil
+
+MB = 1024 * 1024
+WORKER_RSS_BUDGET_MB = int(os.getenv("WORKER_RSS_BUDGET_MB", "2048"))
+BROWSER_RSS_BUDGET_MB = int(os.getenv("BROWSER_RSS_BUDGET_MB", "1024"))
+# Chrome ignores unknown switches but keeps them on its command line, which lets
+# us recognise browsers started by this app after the process that owned them died.
+OWNER_SWITCH = "--blog-generator-owner="
+# Slack for psutil's coarse create_time() when comparing it with the pool snapshot.
+CREATE_TIME_SLACK = 1.0
+
+
+def owner_flag():
+    return f"{OWNER_SWITCH}{os.getpid()}"
+
+
+def process_tree_rss(pid):
+    try:
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for proc in procs:
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def snapshot_tree(pid, expected_name=None):
+    try:
+        root = psutil.Process(pid)
+        # Guard against the pid having been reused by an unrelated process.
+        if expected_name and expected_name not in (root.name() or "").lower():
+            return []
+        return root.children(recursive=True) + [root]
+    except psutil.Error:
+        return []
+
+
+def kill_processes(procs):
+    # psutil.Process remembers each process's create time, so a pid reused since
+    # the snapshot is left alone.
+    alive = [proc for proc in procs if proc.is_running()]
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.Error:
+            continue
+    _, survivors = psutil.wait_procs(alive, timeout=3)
+    return len(alive) - len(survivors)
+
+
+def kill_process_tree(pid, expected_name=None):
+    return kill_processes(snapshot_tree(pid, expected_name))
+
+
+class ResourceGovernor:
+    def __init__(self, browser_pool, worker_budget_mb=WORKER_RSS_BUDGET_MB, browser_budget_mb=BROWSER_RSS_BUDGET_MB):
+        self.browser_pool = browser_pool
+        self.worker_budget = worker_budget_mb * MB
+        self.browser_budget = browser_budget_mb * MB
+        self.lock = threading.Lock()
+        self.reaped = 0
+        self.browsers_recycled = 0
+        self.figures_closed = 0
+        self.over_budget_events = 0
+
+    def reap_orphans(self):
+        # Reaps browsers whose owning process is gone, plus browsers tagged with our
+        # own pid that the pool no longer tracks (leaked by a crashed call, or left
+        # over from before an os.execv recycle, which keeps the pid).
+        reaped = 0
+        me = os.getpid()
+        snapshot_at = time.time()
+        tracked = self.browser_pool.tracked_pids()
+        for proc in psutil.process_iter(["pid", "cmdline"]):
+            cmdline = proc.info.get("cmdline") or []
+            owner = next((arg[len(OWNER_SWITCH):] for arg in cmdline if arg.startswith(OWNER_SWITCH)), None)
+            if not owner or not owner.isdigit():
+                continue
+            owner = int(owner)
+            if owner == me:
+                # tracked is None while the pool is starting a browser it has not registered yet.
+                if tracked is None or proc.pid in tracked:
+                    continue
+                # Another worker may have started a browser after the snapshot was taken.
+                try:
+                    if proc.create_time() >= snapshot_at - CREATE_TIME_SLACK:
+                        continue
+                except psutil.Error:
+                    continue
+            elif psutil.pid_exists(owner):
+                continue
+            try:
+                # Take the chromedriver that launched this browser down with it.
+                parent = proc.parent()
+                if parent and "chromedriver" in (parent.name() or "").lower():
+                    reaped += kill_process_tree(parent.pid)
+                    continue
+            except psutil.Error:
+                pass
+            reaped += kill_process_tree(proc.pid)
+        if reaped:
+            print(f"[Governor] Reaped {reaped} orphaned browser process(es).")
+            with self.lock:
+                self.reaped += reaped
+        return reaped
+
+    def close_stray_figures(self):
+        # Only touch pyplot if something imported it; the visualizer itself no longer uses it.
+        plt = sys.modules.get("matplotlib.pyplot")
+        if plt is None:
+            return 0
+        count = len(plt.get_fignums())
+        if count:
+            plt.close("all")
+            with self.lock:
+                self.figures_closed += count
+        return count
+
+    def worker_rss(self):
+        return psutil.Process().memory_info().rss
+
+    def enforce(self):
+        # Returns True when the worker is still over budget after cleanup and should be recycled.
+        self.close_stray_figures()
+        self.reap_orphans()
+        recycled = self.browser_pool.recycle_idle(max_rss=self.browser_budget)
+        if self.worker_rss() > self.worker_budget:
+            recycled += self.browser_pool.recycle_idle()
+            gc.collect()
+        if recycled:
+            print(f"[Governor] Recycled {recycled} browser(s) over budget.")
+            with self.lock:
+                self.browsers_recycled += recycled
+        if self.worker_rss() > self.worker_budget:
+            with self.lock:
+                self.over_budget_events += 1
+            print(f"[Governor] Worker RSS {self.worker_rss() / MB:.0f} MB is over the {self.worker_budget / MB:.0f} MB budget.")
+            return True
+        return False
+
+    def stats(self):
+        me = psutil.Process()
+        children = me.children(recursive=True)
+        children_rss = 0
+        for child in children:
+            try:
+                children_rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+        plt = sys.modules.get("matplotlib.pyplot")
+        with self.lock:
+            return {
+                "pid": me.pid,
+                "worker_rss_mb": round(me.memory_info().rss / MB, 1),
+                "worker_budget_mb": round(self.worker_budget / MB),
+                "child_processes": len(children),
+                "children_rss_mb": round(children_rss / MB, 1),
+                "open_figures": len(plt.get_fignums()) if plt else 0,
+                "browsers": self.browser_pool.stats(),
+                "orphans_reaped": self.reaped,
+                "browsers_recycled": self.browsers_recycled,
+                "figures_closed": self.figures_closed,
+                "over_budget_events": self.over_budget_events,
+            }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                from agents.pools import browser_pool
+                _governor = ResourceGovernor(browser_pool)
+    return _governor
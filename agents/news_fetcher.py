@@ -1,6 +1,8 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+from agents.pools import get_http_session
+from agents.dedup import dedupe_articles
+from agents.rate_limiter import throttle
 
 def fetch_recent_news(keywords_and_industry, days=7, company=None):
     import re
@@ -11,12 +13,14 @@ def fetch_recent_news(keywords_and_industry, days=7, company=None):
     if company:
         keywords.append(company)
 
+    session = get_http_session()
     news_results = []
     search_url = "https://news.google.com/search?q={kw}%20when:{days}d&hl=en-US&gl=US&ceid=US:en"
     for kw in keywords:
         url = search_url.format(kw=kw.replace(" ", "%20"), days=days)
         try:
-            resp = requests.get(url, timeout=10)
+            throttle(url)
+            resp = session.get(url, timeout=10)
             soup = BeautifulSoup(resp.text, "html.parser")
             for article in soup.select("article"):
                 title = article.text[:100]
@@ -35,4 +39,4 @@ def fetch_recent_news(keywords_and_industry, days=7, company=None):
             print(f"[News Fetch ERROR] {e}")
             continue
         
-    return news_results[:8]
\ No newline at end of file
+    return dedupe_articles(news_results)[:8]
\ No newline at end of file
@@ -1,13 +1,25 @@
 import yaml
-import requests
 from urllib.parse import quote_plus
 from bs4 import BeautifulSoup
 import json
 import feedparser
 from datetime import datetime
+from functools import lru_cache
+from agents.dedup import dedupe_articles
+from agents.research_corpus import get_corpus
+from agents.source_health import get_breaker, hedged_get
+from agents.rate_limiter import RateLimitTimeout
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
 
 LOG_FILE = "fetch_log.json"
+MIN_LOCAL_HITS = 3
+HARVEST_MAX_AGE_HOURS = 24
+RESEARCH_DEADLINE = 45
 
+_fetch_log_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
 def load_sources():
     with open("crewai_config.yaml", "r") as f:
         config = yaml.safe_load(f)
@@ -38,43 +50,52 @@ def save_fetch_log(log):
     with open(LOG_FILE, "w") as f:
         json.dump(log, f, indent=2)
 
-def should_include_article(company, article_id, fetch_log):
-    fetched = fetch_log.get(company, [])
-    if article_id in fetched:
-        return False
-    fetched.append(article_id)
-    fetch_log[company] = fetched
-    save_fetch_log(fetch_log)
-    return True
+def already_fetched(company, article_id, fetch_log):
+    with _fetch_log_lock:
+        return article_id in fetch_log.get(company, [])
+
+def record_fetched(company, articles, fetch_log):
+    # Only articles actually handed back are logged, so a source that misses the
+    # research deadline cannot hide its papers from this company's next report.
+    links = [a.get("link") for a in articles if a.get("source") != "arXiv" and a.get("link")]
+    with _fetch_log_lock:
+        fetched = fetch_log.setdefault(company, [])
+        new_links = [link for link in dict.fromkeys(links) if link not in fetched]
+        if new_links:
+            fetched.extend(new_links)
+            save_fetch_log(fetch_log)
 
-def fetch_arxiv_api(keywords, days=7, max_results=5):
+def fetch_arxiv_api(keywords, days=7, max_results=5, timeout=15, hedge_after=None, max_wait=None):
     query = "+AND+".join([f"all:{kw}" for kw in keywords])
     query_encoded = quote_plus(query)
     url = f"http://export.arxiv.org/api/query?search_query={query_encoded}&sortBy=submittedDate&sortOrder=descending&max_results=25"
 
-    feed = feedparser.parse(url)
+    feed = feedparser.parse(hedged_get(url, timeout=timeout, hedge_after=hedge_after, max_wait=max_wait).content)
     results = []
+    harvested = []
     for entry in feed.entries:
         published = entry.published
         entry_date = datetime.strptime(published, "%Y-%m-%dT%H:%M:%SZ")
-        if (datetime.now() - entry_date).days > days:
-            continue
-        results.append({
+        article = {
             "title": entry.title,
             "publication_date": published[:10],
             "link": entry.link,
             "source": "arXiv",
             "content": entry.summary
-        })
-        if len(results) >= max_results:
-            break
+        }
+        harvested.append(article)
+        if (datetime.now() - entry_date).days > days or len(results) >= max_results:
+            continue
+        results.append(article)
+    get_corpus().add_articles(harvested)
     return results
 
-def scrape_semantic_scholar(query, company, fetch_log, max_results=5):
+def scrape_semantic_scholar(query, company, fetch_log, max_results=5, timeout=10, hedge_after=None, max_wait=None):
     url = f"https://www.semanticscholar.org/search?q={query}&sort=recency"
-    resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    resp = hedged_get(url, timeout=timeout, hedge_after=hedge_after, max_wait=max_wait, headers={"User-Agent": "Mozilla/5.0"})
     soup = BeautifulSoup(resp.text, "html.parser")
     results = []
+    harvested = []
     articles = soup.select('div.cl-paper-row') or soup.select('div.search-result')
     for entry in articles[:max_results * 2]:
         title_elem = entry.find('a', class_='cl-paper-title') or entry.find('a', class_='search-result-title')
@@ -84,26 +105,30 @@ def scrape_semantic_scholar(query, company, fetch_log, max_results=5):
         summary = summary_elem.get_text(strip=True) if summary_elem else ""
         year_elem = entry.find('span', class_='cl-paper-pubyear') or entry.find('span', class_='search-result-year')
         pubdate_str = year_elem.get_text(strip=True) if year_elem else ""
-        if pubdate_str and not is_recent(pubdate_str, 7):
-            continue
-        if not should_include_article(company, link, fetch_log):
-            continue
-        results.append({
+        article = {
             "title": title,
             "publication_date": pubdate_str,
             "link": link,
             "source": "SemanticScholar",
             "content": summary
-        })
+        }
+        harvested.append(article)
         if len(results) >= max_results:
-            break
+            continue
+        if pubdate_str and not is_recent(pubdate_str, 7):
+            continue
+        if already_fetched(company, link, fetch_log):
+            continue
+        results.append(article)
+    get_corpus().add_articles(harvested)
     return results
 
-def scrape_acm(query, company, fetch_log, max_results=5):
+def scrape_acm(query, company, fetch_log, max_results=5, timeout=10, hedge_after=None, max_wait=None):
     url = f"https://dl.acm.org/action/doSearch?AllField={query}"
-    resp = requests.get(url)
+    resp = hedged_get(url, timeout=timeout, hedge_after=hedge_after, max_wait=max_wait)
     soup = BeautifulSoup(resp.text, "html.parser")
     results = []
+    harvested = []
     for item in soup.select('.search__item')[:max_results*2]:
         title_elem = item.find('h5')
         title = title_elem.get_text(strip=True) if title_elem else ""
@@ -112,26 +137,32 @@ def scrape_acm(query, company, fetch_log, max_results=5):
         summary = summary_elem.get_text(strip=True) if summary_elem else ""
         pubdate_elem = item.find('span', class_='bookPubDate') or item.find('span', class_='epub-section__date')
         pubdate_str = pubdate_elem.get_text(strip=True) if pubdate_elem else ""
-        if pubdate_str and not is_recent(pubdate_str, 7):
-            continue
-        if not should_include_article(company, link, fetch_log):
-            continue
-        results.append({
+        article = {
             "title": title,
             "publication_date": pubdate_str,
             "link": link,
             "source": "ACM",
             "content": summary
-        })
+        }
+        harvested.append(article)
         if len(results) >= max_results:
-            break
+            continue
+        if pubdate_str and not is_recent(pubdate_str, 7):
+            continue
+        if already_fetched(company, link, fetch_log):
+            continue
+        results.append(article)
+    get_corpus().add_articles(harvested)
     return results
 
-def scrape_google_scholar(query, company, fetch_log, max_results=5):
+def scrape_google_scholar(query, company, fetch_log, max_results=5, timeout=10, hedge_after=None, max_wait=None):
     url = f"https://scholar.google.com/scholar?q={query}&as_ylo={datetime.now().year}"
-    resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    resp = hedged_get(url, timeout=timeout, hedge_after=hedge_after, max_wait=max_wait, headers={"User-Agent": "Mozilla/5.0"})
+    if "unusual traffic" in resp.text or "gs_captcha" in resp.text:
+        raise RuntimeError("Google Scholar returned a captcha page")
     soup = BeautifulSoup(resp.text, "html.parser")
     results = []
+    harvested = []
     for item in soup.select('.gs_ri')[:max_results*2]:
         title_elem = item.find('h3', class_='gs_rt')
         title = title_elem.get_text(strip=True) if title_elem else ""
@@ -143,42 +174,100 @@ def scrape_google_scholar(query, company, fetch_log, max_results=5):
             import re
             match = re.search(r"\b(20\d{2}|19\d{2})\b", pubdate_elem.get_text())
             pubdate_str = match.group(1) if match else ""
-        if pubdate_str and not is_recent(pubdate_str, 7):
-            continue
-        if not should_include_article(company, link, fetch_log):
-            continue
-        results.append({
+        article = {
             "title": title,
             "publication_date": pubdate_str,
             "link": link,
             "source": "Google Scholar",
             "content": summary
-        })
+        }
+        harvested.append(article)
         if len(results) >= max_results:
-            break
+            continue
+        if pubdate_str and not is_recent(pubdate_str, 7):
+            continue
+        if already_fetched(company, link, fetch_log):
+            continue
+        results.append(article)
+    get_corpus().add_articles(harvested)
     return results
 
-def fetch_articles_and_info(keywords_and_industry, company_name="company"):
+def _run_source(source, keywords, query, company_name, fetch_log):
+    name = source['name']
+    breaker = get_breaker(name, source.get("failure_threshold", 3), source.get("cooldown", 300))
+    if not breaker.allow():
+        print(f"[INFO] Skipping {name}: circuit open after repeated failures.")
+        return False, []
+    options = {"timeout": source.get("timeout", 10), "hedge_after": source.get("hedge_after"), "max_wait": source.get("max_wait")}
+    print(f"[INFO] Scraping {name}...")
+    try:
+        if name == "arxiv":
+            results = fetch_arxiv_api(keywords, days=7, max_results=5, **options)
+        elif name == "semantic_scholar":
+            results = scrape_semantic_scholar(query, company_name, fetch_log, **options)
+        elif name == "acm":
+            results = scrape_acm(query, company_name, fetch_log, **options)
+        elif name == "google_scholar":
+            results = scrape_google_scholar(query, company_name, fetch_log, **options)
+        else:
+            return False, []
+    except RateLimitTimeout as e:
+        # Our own politeness limit, not a source failure; hand back a half-open trial unused.
+        print(f"[WARN] Skipping {name}: {e}")
+        breaker.release_trial()
+        return False, []
+    except Exception as e:
+        print(f"[ERROR] {name} fetch failed: {e}")
+        breaker.record_failure(e)
+        return False, []
+    breaker.record_success()
+    return True, results
+
+def fetch_articles_and_info(keywords_and_industry, company_name="company", deadline=RESEARCH_DEADLINE):
     import re
     match = re.search(r"Keywords:\s*(.*)", keywords_and_industry, re.I)
     keywords = [k.strip() for k in match.group(1).split(",") if k.strip()] if match else []
     query = "+".join(keywords)
-    sources = load_sources()
     fetch_log = load_fetch_log()
-    all_results = []
-    for source in sources:
-        print(f"[INFO] Scraping {source['name']}...")
-        if source['name'] == "arxiv":
-            results = fetch_arxiv_api(keywords, days=7, max_results=5)
-        elif source['name'] == "semantic_scholar":
-            results = scrape_semantic_scholar(query, company_name, fetch_log)
-        elif source['name'] == "acm":
-            results = scrape_acm(query, company_name, fetch_log)
-        elif source['name'] == "google_scholar":
-            results = scrape_google_scholar(query, company_name, fetch_log)
-        else:
-            results = []
-        all_results.extend(results)
+    corpus = get_corpus()
+
+    def is_new_local_hit(article):
+        pubdate_str = article.get("publication_date", "")
+        if pubdate_str and not is_recent(pubdate_str[:10], 7):
+            return False
+        return article.get("source") == "arXiv" or not already_fetched(company_name, article.get("link"), fetch_log)
+
+    local_results = corpus.search(keywords, top_k=10, accept=is_new_local_hit)
+    # The network is only needed for gaps: too few local hits and no recent harvest for these keywords.
+    # An empty local result is always a gap, even if these keywords were harvested recently.
+    if len(local_results) >= MIN_LOCAL_HITS or (local_results and corpus.harvested_recently(keywords, HARVEST_MAX_AGE_HOURS)):
+        print(f"[INFO] Answered from local research corpus ({len(local_results)} articles).")
+        local_results = dedupe_articles(local_results)
+        record_fetched(company_name, local_results, fetch_log)
+        return local_results
+
+    sources = load_sources()
+    # Sources run side by side under one deadline; a stalled source only costs its own results.
+    executor = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="research-source")
+    futures = [executor.submit(_run_source, source, keywords, query, company_name, fetch_log) for source in sources]
+    done, not_done = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False)
+    for future, source in zip(futures, sources):
+        if future in not_done:
+            print(f"[WARN] {source['name']} missed the {deadline}s research deadline; skipping its results.")
+    all_results = list(local_results)
+    any_succeeded = False
+    for future in futures:
+        if future in done:
+            succeeded, results = future.result()
+            any_succeeded = any_succeeded or succeeded
+            all_results.extend(results)
+    # Only a fetch that actually reached a source counts as a harvest; after an
+    # outage the next call must try the network again.
+    if any_succeeded:
+        corpus.mark_harvested(keywords)
+    all_results = dedupe_articles(all_results)
+    record_fetched(company_name, all_results, fetch_log)
     if not all_results:
         print("No articles found in last 7 days from major sources.")
     return all_results
\ No newline at end of file
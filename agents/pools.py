@@ -0,0 +1,200 @@
+import os
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from dotenv import load_dotenv
+from agents.governor import owner_flag, process_tree_rss, snapshot_tree, kill_processes
+
+load_dotenv()
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+_client = None
+_client_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_openai_client():
+    # One client per process; it is thread-safe and keeps its own connection pool.
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = openai.OpenAI()
+    return _client
+
+
+def get_http_session():
+    # requests.Session is not safe to share between threads, so each thread keeps its own.
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def chrome_options():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument(owner_flag())
+    return options
+
+
+class BrowserPool:
+    def __init__(self, size=2):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._drivers = {}
+        self.created = 0
+        self.reused = 0
+        self._starting = 0
+
+    def _new_driver(self):
+        with self._lock:
+            self._starting += 1
+        try:
+            driver = webdriver.Chrome(options=chrome_options())
+            try:
+                pid = driver.service.process.pid
+            except Exception:
+                pid = None
+            with self._lock:
+                self._drivers[driver] = pid
+                self.created += 1
+        finally:
+            with self._lock:
+                self._starting -= 1
+        return driver
+
+    def tracked_pids(self):
+        # Pids of every pooled chromedriver and its descendants, or None while a
+        # browser is still starting and cannot be told apart from a leaked one.
+        with self._lock:
+            if self._starting:
+                return None
+            roots = [pid for pid in self._drivers.values() if pid]
+        pids = set()
+        for pid in roots:
+            pids.update(proc.pid for proc in snapshot_tree(pid))
+        return pids
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        if driver is None:
+            return
+        with self._lock:
+            pid = self._drivers.pop(driver, None)
+        # Snapshot the tree before quit(): afterwards chromedriver is gone and any
+        # surviving Chrome processes have been reparented out of reach.
+        procs = snapshot_tree(pid, expected_name="chromedriver") if pid else []
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[WARN] Could not quit browser cleanly: {e}")
+        killed = kill_processes(procs)
+        if killed:
+            print(f"[WARN] Killed {killed} browser process(es) that survived quit().")
+
+    def _checkout(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_driver()
+            if self._is_alive(driver):
+                with self._lock:
+                    self.reused += 1
+                return driver
+            self._discard(driver)
+
+    @contextmanager
+    def driver(self):
+        self._slots.acquire()
+        driver = None
+        try:
+            driver = self._checkout()
+            yield driver
+        except Exception:
+            # A driver that raised mid-call may be in any state; never hand it out again.
+            self._discard(driver)
+            driver = None
+            raise
+        finally:
+            if driver is not None:
+                self._idle.put(driver)
+            self._slots.release()
+
+    def prewarm(self, count=1):
+        for _ in range(min(count, self.size)):
+            try:
+                self._idle.put(self._new_driver())
+            except Exception as e:
+                print(f"[WARN] Could not prewarm browser: {e}")
+                break
+
+    def recycle_idle(self, max_rss=None):
+        # Quit idle browsers whose process tree exceeds max_rss (or all idle ones when None).
+        keep, recycled = [], 0
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                pid = self._drivers.get(driver)
+            if max_rss is None or (pid and process_tree_rss(pid) > max_rss):
+                self._discard(driver)
+                recycled += 1
+            else:
+                keep.append(driver)
+        for driver in reversed(keep):
+            self._idle.put(driver)
+        return recycled
+
+    def stats(self):
+        with self._lock:
+            pids = [pid for pid in self._drivers.values() if pid]
+            return {
+                "size": self.size,
+                "open": len(self._drivers),
+                "rss_mb": round(sum(process_tree_rss(pid) for pid in pids) / (1024 * 1024), 1),
+                "idle": self._idle.qsize(),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            leftover = list(self._drivers)
+        for driver in leftover:
+            self._discard(driver)
+
+
+browser_pool = BrowserPool(size=int(os.getenv("BROWSER_POOL_SIZE", "2")))
+atexit.register(browser_pool.close)
@@ -0,0 +1,167 @@
+import os
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import yaml
+
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "rate_limits.sqlite3")
+DEFAULT_LIMIT = {"rate": 2.0, "burst": 4}
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+# A waiter that has not refreshed its heartbeat for this long belongs to a dead process.
+STALE_WAITER_SECONDS = 10
+MAX_POLL_SECONDS = 0.25
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS waiters (id INTEGER PRIMARY KEY AUTOINCREMENT, host TEXT NOT NULL,
+    priority INTEGER NOT NULL, pid INTEGER NOT NULL, heartbeat REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS metrics (host TEXT PRIMARY KEY, acquired INTEGER NOT NULL,
+    waited REAL NOT NULL, max_wait REAL NOT NULL);
+"""
+
+
+@lru_cache(maxsize=1)
+def load_rate_limits():
+    try:
+        with open("crewai_config.yaml", "r") as f:
+            config = yaml.safe_load(f)
+        return config.get("rate_limits") or {}
+    except Exception:
+        return {}
+
+
+class HostRateLimiter:
+    def __init__(self, db_path=RATE_LIMIT_DB, limits=None):
+        self.db_path = db_path
+        self.limits = limits if limits is not None else load_rate_limits()
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._process_stats = {}
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite connections may not cross threads; each thread opens its own.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def limit_for(self, host):
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            limit = self.limits.get(".".join(parts[i:]))
+            if limit:
+                return float(limit.get("rate", DEFAULT_LIMIT["rate"])), float(limit.get("burst", DEFAULT_LIMIT["burst"]))
+        default = self.limits.get("default") or DEFAULT_LIMIT
+        return float(default.get("rate", DEFAULT_LIMIT["rate"])), float(default.get("burst", DEFAULT_LIMIT["burst"]))
+
+    def acquire(self, host, priority=PRIORITY_NORMAL, timeout=None):
+        # Returns the seconds spent waiting, or None if no slot was granted within
+        # timeout (timeout=0 is a non-blocking try; None waits indefinitely).
+        rate, burst = self.limit_for(host)
+        conn = self._connect()
+        start = time.time()
+        waiter_id = conn.execute(
+            "INSERT INTO waiters (host, priority, pid, heartbeat) VALUES (?, ?, ?, ?)",
+            (host, priority, os.getpid(), start),
+        ).lastrowid
+        granted = False
+        try:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - STALE_WAITER_SECONDS,))
+                    conn.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, waiter_id))
+                    head = conn.execute(
+                        "SELECT id FROM waiters WHERE host = ? ORDER BY priority, id LIMIT 1", (host,)
+                    ).fetchone()
+                    row = conn.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+                    tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                    if head and head[0] == waiter_id and tokens >= 1:
+                        tokens -= 1
+                        granted = True
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (host, tokens, updated) VALUES (?, ?, ?)", (host, tokens, now)
+                    )
+                    if granted:
+                        waited = now - start
+                        conn.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+                        conn.execute(
+                            "INSERT INTO metrics (host, acquired, waited, max_wait) VALUES (?, 1, ?, ?) "
+                            "ON CONFLICT(host) DO UPDATE SET acquired = acquired + 1, waited = waited + excluded.waited, "
+                            "max_wait = MAX(max_wait, excluded.max_wait)",
+                            (host, waited, waited),
+                        )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                if granted:
+                    self._record(host, waited)
+                    return waited
+                remaining = None if timeout is None else start + timeout - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                pause = min(MAX_POLL_SECONDS, max(0.01, (1 - tokens) / rate))
+                time.sleep(pause if remaining is None else min(pause, remaining))
+        finally:
+            if not granted:
+                conn.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+
+    def _record(self, host, waited):
+        with self._stats_lock:
+            entry = self._process_stats.setdefault(host, {"acquired": 0, "waited": 0.0, "max_wait": 0.0})
+            entry["acquired"] += 1
+            entry["waited"] += waited
+            entry["max_wait"] = max(entry["max_wait"], waited)
+
+    def stats(self, scope="process"):
+        if scope == "global":
+            rows = self._connect().execute("SELECT host, acquired, waited, max_wait FROM metrics").fetchall()
+            stats = {host: {"acquired": a, "waited": w, "max_wait": m} for host, a, w, m in rows}
+        else:
+            with self._stats_lock:
+                stats = {host: dict(entry) for host, entry in self._process_stats.items()}
+        for entry in stats.values():
+            entry["waited"] = round(entry["waited"], 3)
+            entry["max_wait"] = round(entry["max_wait"], 3)
+        return stats
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = HostRateLimiter()
+    return _limiter
+
+
+def throttle(url, priority=PRIORITY_NORMAL, timeout=None):
+    host = (urlsplit(url).hostname or "").lower()
+    if not host:
+        return 0.0
+    waited = get_rate_limiter().acquire(host, priority, timeout)
+    if waited is None:
+        raise RateLimitTimeout(f"No {host} request slot within {timeout}s")
+    if waited >= 1:
+        print(f"[INFO] Waited {waited:.1f}s for a {host} request slot.")
+    return waited
@@ -0,0 +1,274 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+import numpy as np
+
+from agents.dedup import canonicalize_url
+
+CORPUS_DB = os.getenv("RESEARCH_CORPUS_DB", "research_corpus.sqlite3")
+LEGACY_CORPUS_FILE = "research_corpus.json"
+LEGACY_INDEX_FILE = "research_corpus_index.npz"
+DOCUMENT_FIELDS = ("title", "publication_date", "link", "source", "content", "harvested_at")
+STOPWORDS = {"the", "and", "for", "that", "this", "with", "from", "are", "have", "has", "were", "was",
+             "our", "its", "into", "can", "not", "but", "their", "which", "these", "using", "based", "also"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY, url_key TEXT NOT NULL UNIQUE, title TEXT,
+    publication_date TEXT, link TEXT, source TEXT, content TEXT, harvested_at TEXT);
+CREATE TABLE IF NOT EXISTS harvests (query TEXT PRIMARY KEY, harvested_at TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, token TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS index_deltas (first_doc INTEGER PRIMARY KEY, end_doc INTEGER NOT NULL,
+    terms BLOB NOT NULL, docs BLOB NOT NULL, tf BLOB NOT NULL);
+"""
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def query_key(keywords):
+    return ",".join(sorted({k.strip().lower() for k in keywords if k.strip()}))
+
+
+class ResearchCorpus:
+    # Documents, harvest stamps and the TF-IDF index live in SQLite, so a new batch
+    # is an incremental insert rather than a rewrite of the whole corpus. The index
+    # is an inverted index held in NumPy arrays: one (term, doc, tf) entry per
+    # distinct token in a document, sorted by term. Each batch of newly indexed
+    # documents is stored as one delta row and merged into the sorted arrays.
+    # Document ids and term ids are SQLite rowids minus one; rows are never deleted,
+    # so they stay dense and double as array positions.
+    def __init__(self, path=CORPUS_DB, legacy_path=LEGACY_CORPUS_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.documents = []
+        self._reset_index()
+        self._open()
+        self._import_legacy(legacy_path)
+        self._sync_documents()
+
+    def _reset_index(self):
+        self._vocab = {}
+        self._terms = np.empty(0, dtype=np.int32)
+        self._docs = np.empty(0, dtype=np.int32)
+        self._tf = np.empty(0, dtype=np.float32)
+        self._indexed = 0
+        self._weights_stale = True
+
+    def _connect(self):
+        # One connection shared by every thread; all access is serialised by self.lock.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _open(self):
+        try:
+            self.conn = self._connect()
+        except sqlite3.DatabaseError as e:
+            # Keep the damaged database for recovery instead of writing over it.
+            backup = f"{self.path}.corrupt-{int(time.time())}"
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.replace(self.path + suffix, backup + suffix)
+            print(f"[ERROR] Research corpus {self.path} is unreadable ({e}); moved it to {backup} and starting a new corpus.")
+            self.conn = self._connect()
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _import_legacy(self, legacy_path):
+        # One-time import of the JSON corpus written by earlier versions.
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        if self.conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] Could not import legacy research corpus {legacy_path}: {e}")
+            return
+        added = self._insert_documents(data.get("documents", []))
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO harvests (query, harvested_at) VALUES (?, ?)",
+                             list(data.get("harvests", {}).items()))
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+        if os.path.exists(LEGACY_INDEX_FILE):
+            os.remove(LEGACY_INDEX_FILE)
+        print(f"[INFO] Imported {added} documents from {legacy_path} into {self.path}.")
+
+    def _sync_documents(self):
+        # Picks up rows added since the last sync, including ones written by other processes.
+        rows = self.conn.execute(
+            f"SELECT {', '.join(DOCUMENT_FIELDS)} FROM documents WHERE id > ? ORDER BY id", (len(self.documents),)
+        ).fetchall()
+        self.documents.extend(dict(zip(DOCUMENT_FIELDS, row)) for row in rows)
+
+    def _sync_terms(self):
+        rows = self.conn.execute("SELECT id, token FROM terms WHERE id > ? ORDER BY id", (len(self._vocab),)).fetchall()
+        for term_id, token in rows:
+            self._vocab[token] = term_id - 1
+
+    def _insert_documents(self, articles):
+        harvested_at = datetime.now().isoformat(timespec="seconds")
+        rows = []
+        for article in articles:
+            url_key = canonicalize_url(article.get("link"))
+            if not url_key:
+                continue
+            rows.append((url_key, article.get("title", ""), article.get("publication_date", ""), article.get("link", ""),
+                         article.get("source", ""), article.get("content", ""), article.get("harvested_at") or harvested_at))
+        if not rows:
+            return 0
+        with self.lock:
+            with self._transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO documents (url_key, title, publication_date, link, source, content, harvested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                added = conn.total_changes - before
+            self._sync_documents()
+        return added
+
+    def _merge(self, terms, docs, tf):
+        order = np.argsort(terms, kind="stable")
+        terms, docs, tf = terms[order], docs[order], tf[order]
+        # New entries go after the existing ones for each term, which keeps the
+        # arrays sorted without re-sorting the whole index.
+        at = np.searchsorted(self._terms, terms, side="right")
+        self._terms = np.insert(self._terms, at, terms)
+        self._docs = np.insert(self._docs, at, docs)
+        self._tf = np.insert(self._tf, at, tf)
+        self._weights_stale = True
+
+    def _index_new_documents(self):
+        with self._transaction() as conn:
+            self._sync_documents()
+            # Deltas saved by an earlier run or another process since we last looked.
+            deltas = conn.execute(
+                "SELECT end_doc, terms, docs, tf FROM index_deltas WHERE first_doc >= ? ORDER BY first_doc", (self._indexed,)
+            ).fetchall()
+            pending = [(np.frombuffer(t, dtype=np.int32), np.frombuffer(d, dtype=np.int32), np.frombuffer(w, dtype=np.float32))
+                       for _, t, d, w in deltas]
+            indexed = deltas[-1][0] if deltas else self._indexed
+            if indexed < len(self.documents):
+                counts_by_doc = []
+                for doc_id in range(indexed, len(self.documents)):
+                    doc = self.documents[doc_id]
+                    counts = {}
+                    for token in tokenize(f"{doc.get('title', '')} {doc.get('content', '')}"):
+                        counts[token] = counts.get(token, 0) + 1
+                    counts_by_doc.append((doc_id, counts))
+                new_tokens = {token for _, counts in counts_by_doc for token in counts if token not in self._vocab}
+                conn.executemany("INSERT OR IGNORE INTO terms (token) VALUES (?)", [(t,) for t in sorted(new_tokens)])
+                self._sync_terms()
+                terms, docs, tfs = [], [], []
+                for doc_id, counts in counts_by_doc:
+                    for token, count in counts.items():
+                        terms.append(self._vocab[token])
+                        docs.append(doc_id)
+                        tfs.append(count)
+                delta = (np.array(terms, dtype=np.int32), np.array(docs, dtype=np.int32),
+                         np.log1p(np.array(tfs, dtype=np.float32)))
+                conn.execute("INSERT INTO index_deltas (first_doc, end_doc, terms, docs, tf) VALUES (?, ?, ?, ?, ?)",
+                             (indexed, len(self.documents), delta[0].tobytes(), delta[1].tobytes(), delta[2].tobytes()))
+                pending.append(delta)
+                indexed = len(self.documents)
+            self._sync_terms()
+        if pending:
+            self._merge(*(np.concatenate(parts) for parts in zip(*pending)))
+        self._indexed = indexed
+
+    def _ensure_index(self):
+        self._index_new_documents()
+        if self._weights_stale:
+            n = self._indexed
+            vocab_size = len(self._vocab)
+            doc_freq = np.bincount(self._terms, minlength=vocab_size)
+            self._idf = (np.log((1 + n) / (1 + doc_freq)) + 1.0).astype(np.float32)
+            weighted = self._tf * self._idf[self._terms]
+            norms = np.sqrt(np.bincount(self._docs, weights=weighted * weighted, minlength=n))
+            norms[norms == 0] = 1.0
+            self._norms = norms
+            self._starts = np.searchsorted(self._terms, np.arange(vocab_size + 1))
+            self._weights_stale = False
+
+    def add_articles(self, articles):
+        return self._insert_documents(articles)
+
+    def mark_harvested(self, keywords):
+        with self.lock:
+            with self._transaction() as conn:
+                conn.execute("INSERT OR REPLACE INTO harvests (query, harvested_at) VALUES (?, ?)",
+                             (query_key(keywords), datetime.now().isoformat(timespec="seconds")))
+
+    def harvested_recently(self, keywords, max_age_hours=24):
+        with self.lock:
+            row = self.conn.execute("SELECT harvested_at FROM harvests WHERE query = ?", (query_key(keywords),)).fetchone()
+        if not row:
+            return False
+        return (datetime.now() - datetime.fromisoformat(row[0])).total_seconds() <= max_age_hours * 3600
+
+    def search(self, keywords, top_k=10, min_score=0.1, accept=None):
+        # accept(document) filters candidates before the top_k cut, so a caller that
+        # only wants recent papers is not crowded out by older, higher-scoring ones.
+        with self.lock:
+            self._ensure_index()
+            if not self._indexed:
+                return []
+            query = {}
+            for token in tokenize(" ".join(keywords)):
+                term = self._vocab.get(token)
+                if term is not None:
+                    query[term] = query.get(term, 0.0) + 1.0
+            if not query:
+                return []
+            scores = np.zeros(self._indexed, dtype=np.float64)
+            query_norm = 0.0
+            for term, count in query.items():
+                weight = count * self._idf[term]
+                query_norm += weight * weight
+                start, end = self._starts[term], self._starts[term + 1]
+                # Each document appears at most once per term, so plain fancy-index += is safe.
+                scores[self._docs[start:end]] += self._tf[start:end] * self._idf[term] * weight
+            scores /= self._norms * np.sqrt(query_norm)
+            candidates = np.nonzero(scores >= min_score)[0]
+            results = []
+            for i in candidates[np.argsort(-scores[candidates], kind="stable")]:
+                document = self.documents[i]
+                if accept is None or accept(document):
+                    results.append(dict(document))
+                    if len(results) >= top_k:
+                        break
+            return results
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    global _corpus
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                _corpus = ResearchCorpus()
+    return _corpus
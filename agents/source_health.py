@@ -0,0 +1,145 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from agents.pools import get_http_session
+from agents.rate_limiter import throttle, PRIORITY_LOW, RateLimitTimeout
+
+# Room for every source of a couple of concurrent jobs, each with a first attempt
+# and a hedge, plus losers still running out their timeout.
+HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", "32"))
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedged-get")
+
+
+class SourceUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, cooldown=300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_error = ""
+
+    def allow(self):
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                # Let a single trial call through; its outcome decides whether we close again.
+                self.state = "half_open"
+                return True
+            self.skipped += 1
+            return False
+
+    def release_trial(self):
+        # A trial that never reached the source (skipped by our own rate limit) says
+        # nothing about its health. Reopen without restarting the cooldown so the
+        # next call gets the trial instead.
+        with self.lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_success(self):
+        with self.lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = "closed"
+
+    def record_failure(self, error=""):
+        with self.lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200]
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"[WARN] Circuit opened for {self.name} for {self.cooldown}s after: {self.last_error}")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "state": self.state,
+                "successes": self.successes,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "last_error": self.last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, failure_threshold=3, cooldown=300):
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, cooldown)
+        return breaker
+
+
+def source_health_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.stats() for b in breakers}
+
+
+def _get(url, timeout, kwargs, cancelled, started):
+    started.set()
+    # Losing attempts that have not started yet must not send a real request.
+    if cancelled.is_set():
+        raise SourceUnavailable("Attempt cancelled")
+    resp = get_http_session().get(url, timeout=timeout, **kwargs)
+    resp.raise_for_status()
+    return resp
+
+
+def hedged_get(url, timeout=10, hedge_after=None, max_wait=None, **kwargs):
+    # Fire a duplicate request if the first has not answered within hedge_after
+    # seconds and return whichever succeeds first. Time spent waiting for a
+    # rate-limit slot (at most max_wait, default timeout) does not count against
+    # the request timeout. Raises RateLimitTimeout if no slot frees up in time.
+    throttle(url, timeout=timeout if max_wait is None else max_wait)
+    cancelled = threading.Event()
+    started = threading.Event()
+    attempts = [_hedge_executor.submit(_get, url, timeout, kwargs, cancelled, started)]
+    try:
+        # Waiting for a free local thread is not the source's fault: the timeout (and
+        # with it any SourceUnavailable charged to the breaker) starts with the attempt.
+        started.wait()
+        deadline = time.monotonic() + timeout
+        if hedge_after and hedge_after < timeout:
+            done, _ = wait(attempts, timeout=hedge_after)
+            if not done:
+                # Only hedge when a token is free right now; the duplicate yields to
+                # first attempts from other callers and never queues for a slot.
+                try:
+                    throttle(url, PRIORITY_LOW, timeout=0)
+                    attempts.append(_hedge_executor.submit(_get, url, timeout, kwargs, cancelled, threading.Event()))
+                except RateLimitTimeout:
+                    pass
+        pending = set(attempts)
+        last_error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+        raise SourceUnavailable(last_error or f"Timed out after {timeout}s: {url}")
+    finally:
+        cancelled.set()
@@ -1,17 +1,110 @@
 import os
+import re
+import json
+import threading
 import openai
-from dotenv import load_dotenv
-
-load_dotenv()
+from agents.pools import get_openai_client
+from agents.coalescer import coalescer
 
 try:
-    client = openai.OpenAI()
+    client = get_openai_client()
 except openai.OpenAIError as e:
     print(f"[ERROR] Could not configure OpenAI client: {e}")
     exit()
 
-def identify_competitors(website_content, keywords_and_industry):
+CASCADE_ENABLED = os.getenv("SUMMARIZER_CASCADE", "0") == "1"
+DRAFT_MODEL = os.getenv("SUMMARIZER_DRAFT_MODEL", "gpt-4o-mini")
+FINAL_MODEL = "gpt-4o"
+CASCADE_STATS_FILE = "cascade_stats.json"
+REPORT_SECTIONS = {
+    "industry overview": r"industry overview",
+    "competitive landscape": r"competitive landscape",
+    "kpis": r"key performance indicators|\bkpis?\b",
+    "strategic gaps": r"strategic gaps|opportunities",
+    "recommendations": r"recommendations",
+}
+
+_stats_lock = threading.Lock()
+
+def _load_cascade_stats():
+    try:
+        with open(CASCADE_STATS_FILE, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _record_cascade(stage, failed_checks):
+    with _stats_lock:
+        stats = _load_cascade_stats()
+        entry = stats.setdefault(stage, {"drafts": 0, "escalations": 0, "failed_checks": {}})
+        entry["drafts"] += 1
+        if failed_checks:
+            entry["escalations"] += 1
+            for name in failed_checks:
+                entry["failed_checks"][name] = entry["failed_checks"].get(name, 0) + 1
+        with open(CASCADE_STATS_FILE, "w") as f:
+            json.dump(stats, f, indent=2)
+
+def get_cascade_stats():
+    with _stats_lock:
+        stats = _load_cascade_stats()
+    for entry in stats.values():
+        entry["escalation_rate"] = round(entry["escalations"] / entry["drafts"], 3) if entry["drafts"] else 0.0
+    return stats
+
+def _word_count_check(low, high):
+    return lambda text: low <= len(text.split()) <= high
+
+def _sections_check(text):
+    return all(re.search(pattern, text, re.I) for pattern in REPORT_SECTIONS.values())
+
+def _competitors_check(competitors):
+    names = [c.strip() for c in (competitors or "").split(",") if c.strip()]
+    def check(text):
+        if not names:
+            return True
+        mentioned = sum(1 for name in names if name.lower() in text.lower())
+        return mentioned * 2 >= len(names)
+    return check
+
+def _chat(messages, model, max_tokens, temperature):
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+    choice = response.choices[0]
+    return choice.message.content.strip(), choice.finish_reason
+
+def _cascade_chat(stage, messages, max_tokens, temperature, checks):
+    # Draft with the cheaper model and only pay for FINAL_MODEL when a structural check fails.
+    if not CASCADE_ENABLED:
+        return _chat(messages, FINAL_MODEL, max_tokens, temperature)[0]
+    try:
+        draft, finish_reason = _chat(messages, DRAFT_MODEL, max_tokens, temperature)
+        failed = [name for name, check in checks if not check(draft)]
+        # A draft cut off at max_tokens can still pass the structural checks.
+        if finish_reason != "stop":
+            failed.append("truncated")
+    except Exception as e:
+        print(f"[WARN] {stage} draft with {DRAFT_MODEL} failed: {e}")
+        failed = ["draft_error"]
+    _record_cascade(stage, failed)
+    if not failed:
+        print(f"[INFO] {stage}: {DRAFT_MODEL} draft passed all checks.")
+        return draft
+    print(f"[INFO] {stage}: escalating to {FINAL_MODEL} (failed checks: {', '.join(failed)}).")
+    return _chat(messages, FINAL_MODEL, max_tokens, temperature)[0]
+
+def identify_competitors(website_content, keywords_and_industry=None):
     print("Step 1: Identifying competitors...")
+    keywords_and_industry = keywords_and_industry or "Not provided; infer them from the website content."
+    instructions = f"""You are a market analyst. Based on the provided company website content and keywords, identify 3 to 5 of the closest and most direct competitors.
+    Provide only a comma-separated list of company names. Do not add any other text or explanation.
+    Extracted Industry/Keywords:
+    {keywords_and_industry}
+    """
     prompt = f"""You are a market analyst. Based on the provided company website content and keywords, identify 3 to 5 of the closest and most direct competitors.
     Provide only a comma-separated list of company names. Do not add any other text or explanation.
     ---
@@ -21,13 +114,16 @@ def identify_competitors(website_content, keywords_and_industry):
     {keywords_and_industry}
     """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.2
-        )
-        competitors = response.choices[0].message.content.strip()
+        competitors = coalescer.call("competitors", instructions, website_content[:4000], model="gpt-4o-mini", max_tokens=200, temperature=0.2)
+        if competitors is None or competitors.lstrip().startswith(("[", "{")):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=200,
+                temperature=0.2
+            )
+            competitors = response.choices[0].message.content
+        competitors = competitors.strip()
         print(f"Competitors identified: {competitors}")
         return competitors
     except Exception as e:
@@ -60,16 +156,20 @@ def generate_benchmarking_report(website_content, keywords_and_industry, competi
     3. Relevant Articles for Context: {"".join(research_snippets)}
     """
     
+    checks = [
+        ("sections", _sections_check),
+        ("competitors", _competitors_check(competitors)),
+        ("length", _word_count_check(600, 2500)),
+    ]
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages =
+        report = _cascade_chat(
+            "benchmarking_report",
             [{"role": "system", "content": "You are a senior industry analyst and content strategist."},
             {"role": "user", "content": prompt}],
             max_tokens=3000,
-            temperature=0.4
+            temperature=0.4,
+            checks=checks
         )
-        report = response.choices[0].message.content.strip()
         print("Core report generated.")
         return report
     except Exception as e:
@@ -90,14 +190,18 @@ def generate_executive_summary(full_report):
     FULL REPORT:
     {full_report}
     """
+    checks = [
+        ("length", _word_count_check(250, 500)),
+        ("recommendations", lambda text: re.search(r"recommend", text, re.I) is not None),
+    ]
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+        summary = _cascade_chat(
+            "executive_summary",
+            [{"role": "user", "content": prompt}],
             max_tokens=1000,
-            temperature=0.3
+            temperature=0.3,
+            checks=checks
         )
-        summary = response.choices[0].message.content.strip()
         print("Executive summary generated.")
         return summary
     except Exception as e:
@@ -1,5 +1,5 @@
 import json
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import io
 from io import BytesIO
 import base64
@@ -25,13 +25,15 @@ def create_kpi_graph(kpi_json):
 
         df = pd.DataFrame(kpi_data)
 
-        plt.figure(figsize=(8, 4))
-        df.plot(kind="bar")
-        plt.tight_layout()
+        # A standalone Figure is not registered with pyplot, so nothing is left open
+        # between calls and concurrent workers do not share pyplot's global state.
+        fig = Figure(figsize=(8, 4))
+        ax = fig.subplots()
+        df.plot(kind="bar", ax=ax)
+        fig.tight_layout()
 
         buf = BytesIO()
-        plt.savefig(buf, format="png")
-        plt.close()
+        fig.savefig(buf, format="png")
         buf.seek(0)
         return base64.b64encode(buf.read()).decode("utf-8")
     except Exception as e:
@@ -1,25 +1,18 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from bs4 import BeautifulSoup
 import time
+from agents.pools import browser_pool
+from agents.rate_limiter import throttle, PRIORITY_HIGH
 
 def fetch_website_content(url):
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    
-    driver = None
     try:
-        print("Initializing browser for scraping")
-        driver = webdriver.Chrome(options=chrome_options)
-        
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        driver.get(url)
-        time.sleep(5) 
-        page_source = driver.page_source
+        print("Acquiring browser for scraping")
+        with browser_pool.driver() as driver:
+            if not url.startswith(('http://', 'https://')):
+                url = 'https://' + url
+            throttle(url, PRIORITY_HIGH)
+            driver.get(url)
+            time.sleep(5) 
+            page_source = driver.page_source
         soup = BeautifulSoup(page_source, 'html.parser')
         
         for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
@@ -36,7 +29,4 @@ def fetch_website_content(url):
 
     except Exception as e:
         print(f"An error occurred during web scraping: {e}")
-        return None
-    finally:
-        if driver:
-            driver.quit()
\ No newline at end of file
+        return None
\ No newline at end of file
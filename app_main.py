@@ -2,25 +2,36 @@ from agents.website_fetcher import fetch_website_content
 from agents.keyword_extractor import extract_keywords_and_industry
 from agents.news_fetcher import fetch_recent_news
 from agents.paper_fetcher import fetch_articles_and_info
-from agents.summarizer_pro import identify_competitors, generate_benchmarking_report, generate_executive_summary
+from agents.summarizer_pro import identify_competitors, generate_benchmarking_report, generate_executive_summary, get_cascade_stats, CASCADE_ENABLED
 from agents.blog_generator import generate_blog_post, generate_table_data, generate_graph_data
 from agents.visualizer import create_kpi_graph
 from agents.pdf_exporter import save_html_to_pdf
+from agents.rate_limiter import get_rate_limiter
+from agents.governor import get_governor
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from markdown import markdown
 
 class CompanyBlogOrchestrator:
-    def __init__(self, company_name, company_website):
+    def __init__(self, company_name, company_website, output_dir="."):
         self.company_name = company_name
         self.company_website = company_website
+        self.output_dir = output_dir
         self.report_data = {}
 
     def run(self):
+        get_governor().reap_orphans()
         print("\n1. Fetching website content & extracting industry-keywords.")
         self.report_data["website_content"] = fetch_website_content(self.company_website)
-        if not self.report_data["website_content"]: return
-
-        self.report_data["keywords_and_industry"] = extract_keywords_and_industry(self.company_name, self.report_data["website_content"])
+        if not self.report_data["website_content"]: return self.report_data
+
+        # Submitted together so the coalescer can answer both from one gpt-4o-mini call.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            keywords_future = executor.submit(extract_keywords_and_industry, self.company_name, self.report_data["website_content"])
+            competitors_future = executor.submit(identify_competitors, self.report_data["website_content"])
+            self.report_data["keywords_and_industry"] = keywords_future.result()
+            self.report_data["competitors"] = competitors_future.result()
         print(f"\n[Extracted Industry/Keywords]:\n{self.report_data['keywords_and_industry']}\n")
 
         print("\n2. Fetching recent news...")
@@ -29,7 +40,6 @@ class CompanyBlogOrchestrator:
             self.report_data["news_articles"] = fetch_articles_and_info(self.report_data["keywords_and_industry"], self.company_name)
 
         print("\n3. Running Full Competitor and Benchmarking Analysis...")
-        self.report_data["competitors"] = identify_competitors(self.report_data["website_content"], self.report_data["keywords_and_industry"])
         self.report_data["benchmarking_report"] = generate_benchmarking_report(self.report_data["website_content"], self.report_data["keywords_and_industry"], self.report_data["competitors"], self.report_data["news_articles"])
         if self.report_data["benchmarking_report"]:
             self.report_data["executive_summary"] = generate_executive_summary(self.report_data["benchmarking_report"])
@@ -37,6 +47,22 @@ class CompanyBlogOrchestrator:
         print("\n4. Generating Final Blog Post Components...")
         self.generate_blog_components()
         self.create_final_reports()
+        self.report_data["rate_limit_stats"] = get_rate_limiter().stats()
+        for host, entry in self.report_data["rate_limit_stats"].items():
+            print(f"[Rate Limit] {host}: {entry['acquired']} requests, {entry['waited']:.1f}s waiting (max {entry['max_wait']:.1f}s)")
+        governor = get_governor()
+        self.report_data["recycle_worker"] = governor.enforce()
+        self.report_data["resource_stats"] = governor.stats()
+        stats = self.report_data["resource_stats"]
+        print(f"[Resources] worker RSS {stats['worker_rss_mb']} MB / {stats['worker_budget_mb']} MB, "
+              f"{stats['child_processes']} child processes ({stats['children_rss_mb']} MB), "
+              f"{stats['browsers']['open']} browsers open, {stats['orphans_reaped']} orphans reaped, "
+              f"{stats['browsers_recycled']} browsers recycled")
+        if CASCADE_ENABLED:
+            self.report_data["cascade_stats"] = get_cascade_stats()
+            for stage, entry in self.report_data["cascade_stats"].items():
+                print(f"[Cascade] {stage} (cumulative, all runs): {entry['escalations']}/{entry['drafts']} escalated ({entry['escalation_rate']:.0%})")
+        return self.report_data
 
     def generate_blog_components(self):
         ind_match = re.search(
@@ -62,7 +88,9 @@ class CompanyBlogOrchestrator:
                 ]
             )
 
-        self.report_data["blog_prose"] = generate_blog_post(
+        executor = ThreadPoolExecutor(max_workers=3)
+        blog_future = executor.submit(
+            generate_blog_post,
             self.report_data["industry"],
             self.report_data["keywords"],
             self.report_data["core_content"],
@@ -78,13 +106,14 @@ class CompanyBlogOrchestrator:
                 for a in self.report_data["news_articles"]
             ],
         )
+        # Table and graph share the same summary, so they are coalesced into one call.
+        table_future = executor.submit(generate_table_data, self.report_data["core_content"])
+        graph_future = executor.submit(generate_graph_data, self.report_data["core_content"])
+        executor.shutdown(wait=True)
 
-        self.report_data["table_markdown"] = generate_table_data(
-            self.report_data["core_content"]
-        )
-        self.report_data["graph_json"] = generate_graph_data(
-            self.report_data["core_content"]
-        )
+        self.report_data["blog_prose"] = blog_future.result()
+        self.report_data["table_markdown"] = table_future.result()
+        self.report_data["graph_json"] = graph_future.result()
 
     def create_final_reports(self):
         if not self.report_data.get("blog_prose"):
@@ -121,12 +150,15 @@ class CompanyBlogOrchestrator:
         """
 
         safe_company_name = self.company_name.replace(" ", "_").replace("/", "_")
-        html_filename = f"{safe_company_name}_Insight_Digest.html"
+        os.makedirs(self.output_dir, exist_ok=True)
+        html_filename = os.path.join(self.output_dir, f"{safe_company_name}_Insight_Digest.html")
         with open(html_filename, "w", encoding="utf-8") as f:
             f.write(html_output_string)
 
         print(f"\n========== Final Report Generated ==========\n")
         print(f"HTML report saved to '{html_filename}'")
+        self.report_data["html_path"] = html_filename
 
-        pdf_filename = f"{safe_company_name}_Insight_Digest.pdf"
-        save_html_to_pdf(html_filename, pdf_filename)
\ No newline at end of file
+        pdf_filename = os.path.join(self.output_dir, f"{safe_company_name}_Insight_Digest.pdf")
+        if save_html_to_pdf(html_filename, pdf_filename):
+            self.report_data["pdf_path"] = pdf_filename
\ No newline at end of file
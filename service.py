@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app_main import CompanyBlogOrchestrator
+from agents.paper_fetcher import load_sources
+from agents.pools import browser_pool, get_openai_client
+from agents.source_health import source_health_stats
+from agents.rate_limiter import get_rate_limiter
+from agents.summarizer_pro import get_cascade_stats, CASCADE_ENABLED
+from agents.governor import get_governor
+
+JOB_FIELDS = ("job_id", "company_name", "company_website", "status", "error",
+              "submitted_at", "started_at", "finished_at", "html_path", "pdf_path")
+
+
+class JobService:
+    def __init__(self, workers=2, queue_size=8, output_dir="service_output"):
+        self.workers = workers
+        self.output_dir = output_dir
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.running = 0
+        self.recycling = False
+        self.jobs_file = os.path.join(output_dir, "jobs.json")
+        self._load_jobs()
+
+    def _load_jobs(self):
+        # Finished jobs survive a worker recycle; anything in flight at that point is reported as interrupted.
+        try:
+            with open(self.jobs_file, "r") as f:
+                self.jobs = json.load(f)
+        except Exception:
+            self.jobs = {}
+        for job in self.jobs.values():
+            if job["status"] in ("queued", "running"):
+                job.update(status="failed", error="Interrupted by a service restart.", finished_at=time.time())
+
+    def _save_jobs(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = f"{self.jobs_file}.tmp"
+        with self.lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.jobs, f, indent=2)
+            os.replace(tmp_path, self.jobs_file)
+
+    def warm_up(self):
+        print("[INFO] Warming up pools...")
+        get_governor().reap_orphans()
+        get_openai_client()
+        load_sources()
+        browser_pool.prewarm(self.workers)
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"report-worker-{i}", daemon=True).start()
+
+    def submit(self, company_name, company_website):
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "company_name": company_name,
+            "company_website": company_website,
+            "status": "queued",
+            "error": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "html_path": None,
+            "pdf_path": None,
+        }
+        # Checked and enqueued under the lock so no job can slip in after the recycle idle check.
+        with self.lock:
+            if self.recycling:
+                return None
+            try:
+                self.pending.put_nowait(job["job_id"])
+            except queue.Full:
+                return None
+            self.jobs[job["job_id"]] = job
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return {k: job[k] for k in JOB_FIELDS} if job else None
+
+    def stats(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            running = self.running
+        return {
+            "workers": self.workers,
+            "running": running,
+            "queued": self.pending.qsize(),
+            "queue_capacity": self.pending.maxsize,
+            "jobs": counts,
+            "browser_pool": browser_pool.stats(),
+            "sources": source_health_stats(),
+            "rate_limits": get_rate_limiter().stats("global"),
+            "cascade": get_cascade_stats() if CASCADE_ENABLED else None,
+            "resources": get_governor().stats(),
+            "recycling": self.recycling,
+        }
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _worker(self):
+        while True:
+            job_id = self.pending.get()
+            job = self.get(job_id)
+            with self.lock:
+                self.running += 1
+            self._update(job_id, status="running", started_at=time.time())
+            recycle = False
+            try:
+                orchestrator = CompanyBlogOrchestrator(
+                    job["company_name"], job["company_website"],
+                    output_dir=os.path.join(self.output_dir, job_id),
+                )
+                report_data = orchestrator.run()
+                recycle = report_data.get("recycle_worker", False)
+                if report_data.get("html_path"):
+                    self._update(job_id, status="done",
+                                 html_path=report_data.get("html_path"),
+                                 pdf_path=report_data.get("pdf_path"))
+                else:
+                    self._update(job_id, status="failed", error="No report was produced.")
+            except Exception as e:
+                print(f"[ERROR] Job {job_id} failed: {e}")
+                self._update(job_id, status="failed", error=str(e))
+                recycle = get_governor().enforce()
+            finally:
+                self._update(job_id, finished_at=time.time())
+                with self.lock:
+                    self.running -= 1
+                self._save_jobs()
+                self.pending.task_done()
+            with self.lock:
+                if recycle and not self.recycling:
+                    print("[Governor] Worker over memory budget; draining queue before recycling the service.")
+                    self.recycling = True
+                # unfinished_tasks also counts jobs another worker has dequeued but not yet
+                # marked running, so a job in that gap is never killed by execv.
+                idle = self.recycling and self.pending.unfinished_tasks == 0
+            if idle:
+                self._recycle()
+
+    def _recycle(self):
+        # Re-exec into a fresh interpreter: the only way to hand leaked heap back to the OS.
+        print("[Governor] Recycling service process.")
+        browser_pool.close()
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def make_handler(service):
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_file(self, path, content_type):
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send_json(404, {"error": "Not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                return self._send_json(400, {"error": "Body must be JSON."})
+            if not isinstance(payload, dict):
+                return self._send_json(400, {"error": "Body must be a JSON object."})
+            company_name = (payload.get("company_name") or "").strip()
+            company_website = (payload.get("company_website") or "").strip()
+            if not company_name or not company_website:
+                return self._send_json(400, {"error": "company_name and company_website are required."})
+            job = service.submit(company_name, company_website)
+            if job is None:
+                return self._send_json(503, {"error": "Service is saturated, retry later."}, {"Retry-After": "30"})
+            self._send_json(202, {"job_id": job["job_id"], "status": job["status"]})
+
+        def do_GET(self):
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            if parts == ["health"]:
+                return self._send_json(200, service.stats())
+            if len(parts) < 2 or parts[0] != "jobs":
+                return self._send_json(404, {"error": "Not found"})
+            job = service.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "Unknown job"})
+            if len(parts) == 2:
+                return self._send_json(200, job)
+            if len(parts) == 3 and parts[2] in ("html", "pdf"):
+                path = job.get(f"{parts[2]}_path")
+                if not path or not os.path.exists(path):
+                    return self._send_json(409, {"error": f"No {parts[2]} artifact for job in status '{job['status']}'."})
+                content_type = "text/html; charset=utf-8" if parts[2] == "html" else "application/pdf"
+                return self._send_file(path, content_type)
+            self._send_json(404, {"error": "Not found"})
+
+        def log_message(self, format, *args):
+            print(f"[HTTP] {self.address_string()} {format % args}")
+
+    return JobRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Insight Digest generator as a resident job service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVICE_WORKERS", "2")))
+    parser.add_argument("--queue-size", type=int, default=int(os.getenv("SERVICE_QUEUE_SIZE", "8")))
+    parser.add_argument("--output-dir", default=os.getenv("SERVICE_OUTPUT_DIR", "service_output"))
+    args = parser.parse_args()
+
+    service = JobService(workers=args.workers, queue_size=args.queue_size, output_dir=args.output_dir)
+    service.warm_up()
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"[INFO] Service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Shutting down service.")
+    finally:
+        server.server_close()
+        browser_pool.close()
+
+
+if __name__ == "__main__":
+    main()